@@ -1,17 +1,23 @@
 from __future__ import annotations
 
+import copy
 import os
+import queue
 import re
-import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from functools import cached_property
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
+import requests
+from lxml import html as lxml_html
+from lxml.etree import ParserError
 from selenium import webdriver
-from selenium.common.exceptions import NoSuchWindowException
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.remote.webelement import WebElement
+from selenium.webdriver.support.ui import WebDriverWait
 
 import exceptions
 import safe_download
@@ -19,6 +25,10 @@ import safe_download
 
 class BaseArchivedWebPage:
     API_URL = "https://archive.org/wayback/available"
+    PREFETCH_WORKERS = 8
+
+    # availability API results shared between every page, keyed by url
+    _availability_cache: Dict[str, dict] = {}
 
     class Snapshot:
         def __init__(self, data: dict):
@@ -38,8 +48,30 @@ class BaseArchivedWebPage:
         self.url: str = url
         self._archived_snapshots = None
 
+    @classmethod
+    def _request_availability(cls, url: str) -> dict:
+        if url not in cls._availability_cache:
+            r = safe_download.safe_request(cls.API_URL, params={'url': url})
+            r.raise_for_status()
+            cls._availability_cache[url] = r.json()["archived_snapshots"]
+        return cls._availability_cache[url]
+
+    @classmethod
+    def prefetch(cls, urls: Iterable[str]):
+        """Looks up the availability of many urls at once so later lookups are served from the cache."""
+        urls = {url for url in urls if url not in cls._availability_cache}
+        with ThreadPoolExecutor(max_workers=cls.PREFETCH_WORKERS) as executor:
+            futures = [executor.submit(cls._request_availability, url) for url in urls]
+
+        for future in futures:
+            try:
+                future.result()
+            except Exception:
+                # failed lookups stay uncached, so they are retried (or reported) when that page is actually used
+                pass
+
     def _cache(self):
-        self._archived_snapshots = safe_download.safe_request(self.API_URL, params={'url': self.url}).json()["archived_snapshots"]
+        self._archived_snapshots = self._request_availability(self.url)
 
     def cache_if_not_cached(self):
         if self._archived_snapshots is None:
@@ -60,31 +92,119 @@ class BaseArchivedWebPage:
     @cached_property
     def snapshot(self) -> Optional[Snapshot]:
         self.cache_if_not_cached()
-        return BaseArchivedWebPage.Snapshot(self._archived_snapshots['closest'])
+        # copy it as the snapshot consumes the dict, which is shared through the cache
+        return BaseArchivedWebPage.Snapshot(dict(self._archived_snapshots['closest']))
+
+
+class BrowserPool:
+    """Keeps Chrome instances alive so they can be reused between profiles instead of relaunched."""
+
+    # only the markup is scraped, so none of these need to be fetched
+    BLOCKED_URLS = ['*.jpg', '*.jpeg', '*.png', '*.gif', '*.webp', '*.mp4', '*.woff', '*.woff2', '*.ttf']
+
+    def __init__(self, headless=False):
+        self.headless = headless
+        self._idle: queue.Queue[webdriver.Chrome] = queue.Queue()
+        self._browsers: List[webdriver.Chrome] = []
+        self._lock = threading.Lock()
+
+    def _options(self) -> Options:
+        options = Options()
+        # return as soon as the DOM is ready, the wayback toolbar and other late assets aren't needed
+        options.page_load_strategy = 'eager'
+        options.add_experimental_option('excludeSwitches', ['enable-logging'])
+        options.add_argument('--disable-extensions')
+        options.add_argument('--blink-settings=imagesEnabled=false')
+        options.add_experimental_option('prefs', {
+            'profile.managed_default_content_settings.images': 2,
+            'profile.default_content_setting_values.notifications': 2
+        })
+        if self.headless is True:
+            options.add_argument('headless')
+        return options
+
+    def acquire(self) -> webdriver.Chrome:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            browser = webdriver.Chrome(options=self._options())
+            browser.execute_cdp_cmd('Network.enable', {})
+            browser.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.BLOCKED_URLS})
+            with self._lock:
+                self._browsers.append(browser)
+            return browser
+
+    @staticmethod
+    def _quit(browser: webdriver.Chrome):
+        try:
+            browser.quit()
+        except WebDriverException:
+            # the window was closed by the user or the session is already gone
+            pass
+
+    def release(self, browser: webdriver.Chrome):
+        try:
+            browser.current_url
+        except WebDriverException:
+            # don't hand a dead browser to the next profile, a new one is launched instead
+            with self._lock:
+                self._browsers.remove(browser)
+            self._quit(browser)
+        else:
+            self._idle.put(browser)
+
+    def close(self):
+        with self._lock:
+            browsers, self._browsers = self._browsers, []
+
+        for browser in browsers:
+            self._quit(browser)
 
 
 class ArchivedPlaysTVBrowser(BaseArchivedWebPage):
-    def __init__(self, user_name: str, headless=False):
+    _COUNT_RE = re.compile(r"\((\d+)\)")
+    # https://web.archive.org/web/20191210000000im_/https://... -> https://...
+    _WAYBACK_PREFIX_RE = re.compile(r"^(?:(?:https?:)?//web\.archive\.org)?/web/\d+[a-z_]*/")
+
+    SCROLL_AND_COUNT_SCRIPT = ("window.scrollTo(0, document.body.scrollHeight);"
+                               "return document.querySelectorAll('.video-item').length;")
+
+    # collects the date, title and poster of every visible video in one call
+    EXTRACT_VIDEOS_SCRIPT = """
+        return Array.from(document.querySelectorAll('.video-list-container')).flatMap(container => {
+            const date = container.querySelector('.video-list-month').innerText.trim();
+            return Array.from(container.querySelectorAll('.video-item')).map(video => ({
+                date: date,
+                title: video.querySelector('.title').innerText.trim(),
+                poster: video.querySelector('.video-tag').getAttribute('poster')
+            }));
+        });
+    """
+
+    def __init__(self, user_name: str, headless=False, pool: Optional[BrowserPool] = None):
         self.username = user_name
         self.browser = None
         self.headless = headless
 
+        # without a shared pool the browser is ours alone and is shut down on close
+        self._owns_pool = pool is None
+        self.pool = BrowserPool(headless=headless) if pool is None else pool
+
         super(ArchivedPlaysTVBrowser, self).__init__(url=f"http://plays.tv/u/{self.username}")
 
     def close(self):
-        try:
-            self.browser.close()
-        except NoSuchWindowException:
-            pass
+        if self.browser is not None:
+            self.pool.release(self.browser)
+            self.browser = None
+
+        if self._owns_pool:
+            self.pool.close()
 
     def launch_the_browser(self):
-        options = Options()
-        options.add_experimental_option('excludeSwitches', ['enable-logging'])
-        if self.headless is True:
-            options.add_argument('headless')
+        url = self.snapshot.url
 
-        self.browser = webdriver.Chrome(options=options)
-        self.browser.get(self.snapshot.url)
+        self.browser = self.pool.acquire()
+        self.browser.get(url)
 
     @property
     def total_video_count(self) -> int:
@@ -92,72 +212,102 @@ class ArchivedPlaysTVBrowser(BaseArchivedWebPage):
             self.browser.find_element(By.CLASS_NAME, 'header-btn').find_element(By.CLASS_NAME,
                 'section-value').text)
 
-    @property
-    def author_video_count(self) -> int:
+    @classmethod
+    def _parse_video_count(cls, label: str) -> int:
         """Midorina's Videos (148) -> 148"""
+        return int(cls._COUNT_RE.search(label).group(1))
+
+    @cached_property
+    def author_video_count(self) -> int:
         label: str = self.browser.find_element(By.CLASS_NAME, 'nav-tab-label').text
-        se = re.search("\(([^)]*)\)", label)
-        return int(se.group(0)[1:-1])
+        return self._parse_video_count(label)
 
     @property
     def featured_video_count(self) -> int:
         return self.total_video_count - self.author_video_count
 
-    def scroll_down_until_all_videos_are_visible(self):
+    def scroll_down_until_all_videos_are_visible(self, timeout: float = 3, max_stalls: int = 15):
         """
-        Scrolls down the page until all author videos are visible or max iterations reached.
+        Scrolls down the page until all author videos are visible or loading stalls.
 
-        This method sends PAGE_DOWN key presses to load more video content through
-        infinite scrolling, checking periodically if all videos have been loaded.
+        Keeps scrolling to the bottom until more videos show up. Internet Archive can be slow
+        to load the next batch, so it only gives up after `max_stalls` timeouts in a row.
         """
-        elem = self.browser.find_element(By.TAG_NAME, "body")
-        i = 0
-        # Maximum number of iterations to prevent infinite loop
-        max_iterations = 100  # Adjust based on expected maximum page size
-
-        # Track visible videos to detect when no new videos are loading
-        previous_video_count = 0
-        unchanged_count = 0
-        max_unchanged = 5  # Exit if count is unchanged for this many consecutive checks
-
-        while i < max_iterations:
-            elem.send_keys(Keys.PAGE_DOWN)
-            time.sleep(1)
-            i += 1
-
-            # Check video count at regular intervals
-            if i % 10 == 0:
-                current_videos = len(self.get_all_visible_videos())
-
-                # Success condition: we've found all expected videos
-                if current_videos >= self.author_video_count:
-                    return
+        video_count = 0
+        stalls = 0
 
-                # Stagnation detection: no new videos loaded after multiple checks
-                if current_videos == previous_video_count:
-                    unchanged_count += 1
-                    if unchanged_count >= max_unchanged:
-                        print(f"Warning: Stopped scrolling after {i} iterations. "
-                              f"Found {current_videos}/{self.author_video_count} videos.")
-                        return
-                else:
-                    # Reset counter if new videos were loaded
-                    unchanged_count = 0
+        def more_videos_loaded(browser: webdriver.Chrome):
+            count = browser.execute_script(self.SCROLL_AND_COUNT_SCRIPT)
+            return count if count > video_count else False
 
-                previous_video_count = current_videos
+        while video_count < self.author_video_count:
+            try:
+                video_count = WebDriverWait(self.browser, timeout, poll_frequency=0.2).until(more_videos_loaded)
+            except TimeoutException:
+                stalls += 1
+                if stalls >= max_stalls:
+                    print(f"Warning: Stopped scrolling as no new videos loaded in {timeout * max_stalls} seconds. "
+                          f"Found {video_count}/{self.author_video_count} videos.")
+                    return
+            else:
+                stalls = 0
 
-        # If we reach here, we hit the maximum number of iterations
-        print(f"Warning: Reached maximum scroll iterations ({max_iterations}). "
-              f"Found {len(self.get_all_visible_videos())}/{self.author_video_count} videos.")
+    def _create_videos(self, videos: List[dict]) -> List["ArchivedVideo"]:
+        return [ArchivedVideo(date_str=video['date'],
+                              author_str=self.username,
+                              title=video['title'],
+                              poster_link=video['poster'])
+                for video in videos]
 
     def get_all_visible_videos(self) -> List["ArchivedVideo"]:
-        ret = []
-        containers = self.browser.find_elements(By.CLASS_NAME, "video-list-container")
-        for container in containers:
-            date_str = container.find_element(By.CLASS_NAME, 'video-list-month').text
-            video_elements: List[WebElement] = container.find_elements(By.CLASS_NAME, "video-item")
-            ret.extend(list(map(lambda x: ArchivedVideo(x, date_str, self.username), video_elements)))
-        return ret
+        videos: List[dict] = self.browser.execute_script(self.EXTRACT_VIDEOS_SCRIPT)
+        return self._create_videos(videos)
+
+    @staticmethod
+    def _find_by_class(element, class_name: str) -> list:
+        return element.xpath(f".//*[contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')]")
+
+    @classmethod
+    def _parse_archived_page(cls, page: str) -> Tuple[Optional[int], List[dict]]:
+        """Returns the author video count (None if the page has no label for it) and the videos listed on the page."""
+        document = lxml_html.fromstring(page)
+
+        labels = cls._find_by_class(document, 'nav-tab-label')
+        count = cls._parse_video_count(labels[0].text_content()) if labels else None
+
+        videos = []
+        for container in cls._find_by_class(document, 'video-list-container'):
+            date_str = cls._find_by_class(container, 'video-list-month')[0].text_content().strip()
+            for video in cls._find_by_class(container, 'video-item'):
+                poster = cls._find_by_class(video, 'video-tag')[0].get('poster')
+                videos.append({
+                    'date': date_str,
+                    'title': cls._find_by_class(video, 'title')[0].text_content().strip(),
+                    # wayback rewrites links in the served HTML, the browser sees the original ones
+                    'poster': cls._WAYBACK_PREFIX_RE.sub('', poster, count=1)
+                })
+
+        return count, videos
+
+    def get_all_videos_without_browser(self) -> Optional[List["ArchivedVideo"]]:
+        """
+        Reads the videos straight from the archived page's HTML, without launching a browser.
+
+        Returns None if the page can't be read or doesn't list every author video up front,
+        in which case the browser has to scroll down to load the rest.
+        """
+        r = safe_download.safe_request(self.snapshot.url)
+        try:
+            r.raise_for_status()
+            count, videos = self._parse_archived_page(r.text)
+        except (requests.HTTPError, ParserError, IndexError, TypeError):
+            # an error page, an empty body or a video missing some of its elements (or its poster)
+            return None
+
+        if count is None or len(videos) < count:
+            return None
+
+        return self._create_videos(videos)
 
 
 class ArchivedVideo(BaseArchivedWebPage):
@@ -167,12 +317,19 @@ class ArchivedVideo(BaseArchivedWebPage):
         480
     ]
 
-    def __init__(self, web_obj: WebElement, date_str: str, author_str: str, quality: int = 720):
+    def __init__(self, web_obj: Optional[WebElement] = None, date_str: str = '', author_str: str = '',
+                 quality: int = 720, title: Optional[str] = None, poster_link: Optional[str] = None):
         self.web_element = web_obj
         self.author = author_str
         self.date_str = date_str
         self.quality = quality
 
+        # pre-fill the cached properties so the web element never has to be queried
+        if title is not None:
+            self.title = title
+        if poster_link is not None:
+            self.poster_link = poster_link
+
         super(ArchivedVideo, self).__init__(self.mp4_url)
 
     @cached_property
@@ -185,38 +342,72 @@ class ArchivedVideo(BaseArchivedWebPage):
 
     @cached_property
     def id(self) -> str:
-        return self.poster_link.split('/')[-3]
+        return self.poster_link.rsplit('/', 3)[-3]
 
-    @property
-    def mp4_url(self):
-        return '/'.join(self.poster_link.split('/')[:-1]) + f'/{self.quality}.mp4'
+    @cached_property
+    def _poster_prefix(self) -> str:
+        prefix, _, _ = self.poster_link.rpartition('/')
+        return prefix
+
+    @cached_property
+    def mp4_url(self) -> str:
+        return f'{self._poster_prefix}/{self.quality}.mp4'
+
+    def _with_quality(self, quality: int) -> ArchivedVideo:
+        """Copies the video with another quality, keeping everything that doesn't depend on the quality."""
+        vid = copy.copy(self)
+        vid.quality = quality
+        for attr in ('mp4_url', 'snapshot'):
+            vid.__dict__.pop(attr, None)
+
+        vid._archived_snapshots = None
+        vid.url = vid.mp4_url
+        return vid
 
     def __repr__(self):
         return f'{self.title}_{self.date_str}_{self.author}_{self.id}_{self.quality}.mp4'
 
-    def check_if_any_quality_exists(self, directory: str):
-        """This is quite sketchy but should do the trick."""
-        for file in os.listdir(directory):
-            if self.id in file:
-                raise exceptions.AlreadyDownloaded(f"Video is already downloaded: {file}")
-
-    def download(self, directory: str, overwrite=False):
+    @staticmethod
+    def _extract_id(file_name: str) -> Optional[str]:
+        """Title_Date_Author_ID_Quality.mp4 -> ID"""
+        parts = file_name.rsplit('_', 2)
+        return parts[1] if len(parts) == 3 else None
+
+    @classmethod
+    def scan_downloaded_ids(cls, directory: str) -> Dict[str, str]:
+        """Maps the id of every video in the directory to its file name."""
+        with os.scandir(directory) as entries:
+            files = {cls._extract_id(entry.name): entry.name for entry in entries if entry.is_file()}
+        files.pop(None, None)
+        return files
+
+    def check_if_any_quality_exists(self, directory: str, downloaded_ids: Optional[Dict[str, str]] = None):
+        """Pass the result of scan_downloaded_ids to avoid scanning the directory for every video."""
+        if downloaded_ids is None:
+            downloaded_ids = self.scan_downloaded_ids(directory)
+
+        if self.id in downloaded_ids:
+            raise exceptions.AlreadyDownloaded(f"Video is already downloaded: {downloaded_ids[self.id]}")
+
+    def download(self, directory: str, overwrite=False, downloaded_ids: Optional[Dict[str, str]] = None):
         if overwrite is False:
-            self.check_if_any_quality_exists(directory)
+            self.check_if_any_quality_exists(directory, downloaded_ids)
 
         self.snapshot.download(directory=directory, file_name=self.__repr__())
 
-    def attempt_to_download_highest_quality(self, directory: str, overwrite=False):
-        for quality in self.QUALITIES:
-            if quality == self.quality:
-                vid = self
-            else:
-                vid = ArchivedVideo(web_obj=self.web_element,
-                                    date_str=self.date_str,
-                                    author_str=self.author,
-                                    quality=quality)
+    def attempt_to_download_highest_quality(self, directory: str, overwrite=False,
+                                            downloaded_ids: Optional[Dict[str, str]] = None):
+        if overwrite is False:
+            self.check_if_any_quality_exists(directory, downloaded_ids)
+
+        variants = [self if quality == self.quality else self._with_quality(quality) for quality in self.QUALITIES]
+        # look every quality up at once, the loop below then picks the highest archived one from the cache
+        self.prefetch(vid.url for vid in variants)
+
+        for vid in variants:
             try:
-                vid.download(directory, overwrite)
+                # already checked for existing downloads above, so skip download()'s check
+                vid.snapshot.download(directory=directory, file_name=vid.__repr__())
             except exceptions.NotArchived:
                 continue
             else:
@@ -1,5 +1,8 @@
 import argparse
 import pathlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
 
 import exceptions
 import models
@@ -7,8 +10,10 @@ import models
 parser = argparse.ArgumentParser(description='Download most of your Plays.TV videos from the web archive.')
 
 parser.add_argument(
-    'username',
-    help='your Plays.TV username')
+    'usernames',
+    nargs='+',
+    metavar='username',
+    help='your Plays.TV username (several can be given)')
 parser.add_argument(
     '-p',
     '--path',
@@ -28,53 +33,111 @@ parser.add_argument(
     action='store_true',
     dest='headless',
     help='use a headless browser (no gui)')
+parser.add_argument(
+    '-j', '--jobs',
+    default=4,
+    type=int,
+    metavar='N',
+    dest='jobs',
+    help='how many videos to look up and download at the same time')
+parser.add_argument(
+    '-u', '--users-at-once',
+    default=3,
+    type=int,
+    metavar='N',
+    dest='users_at_once',
+    help='how many profiles to scrape at the same time, each with its own browser')
 
 args = parser.parse_args()
 
-# first check if the directory exists
-pathlib.Path(args.download_path).mkdir(parents=True, exist_ok=True)
 
-browser = models.ArchivedPlaysTVBrowser(user_name=args.username, headless=args.headless)
+def download_video(video: models.ArchivedVideo, downloaded_ids: dict) -> bool:
+    """Returns whether the video is on disk after the attempt."""
+    try:
+        video.attempt_to_download_highest_quality(directory=args.download_path,
+                                                  overwrite=args.overwrite,
+                                                  downloaded_ids=downloaded_ids)
+    except exceptions.NotArchived as e:
+        print(e)
+        return False
+    except exceptions.AlreadyDownloaded as e:
+        print(e)
+        return True
+    except requests.RequestException as e:
+        print(f"Internet Archive didn't let us download the video {video.title}: {e}")
+        return False
+    else:
+        print(f"Done: {video.title}")
+        return True
 
-try:
-    print("https://midorina.dev || Feel free to contact me if you have questions or issues <3\n\n"
-          "Launching the browser. Do not close it until we're done.\n"
-          "Internet Archive's website is noticeably slow, so this may take a while...\n")
+
+def scrape_user(username: str, pool: models.BrowserPool):
+    browser = models.ArchivedPlaysTVBrowser(user_name=username, headless=args.headless, pool=pool)
 
     try:
-        browser.launch_the_browser()
-    except exceptions.NotArchived:
-        print("Looks like your profile is not archived at all... This is weird.\n"
-              "This might be an issue from Internet Archive's API. "
-              "If you think this is a mistake, try again in a few minutes.")
-        exit()
+        try:
+            videos = browser.get_all_videos_without_browser()
+        except exceptions.NotArchived:
+            print(f"[{username}] Looks like this profile is not archived at all... This is weird.\n"
+                  "This might be an issue from Internet Archive's API. "
+                  "If you think this is a mistake, try again in a few minutes.")
+            return
+        except requests.RequestException as e:
+            print(f"[{username}] Internet Archive didn't let us look this profile up, try again in a few minutes: {e}")
+            return
+
+        if videos is not None:
+            author_video_count = len(videos)
+            print(f"[{username}] All {author_video_count} of your videos are on the archived page, "
+                  f"no need for the browser.")
+        else:
+            browser.launch_the_browser()
+
+            author_video_count = browser.author_video_count
+            print(f"[{username}] You seem to have {browser.total_video_count} videos on Plays.TV\n"
+                  f"{author_video_count} of them are uploaded by you, "
+                  f"and you're featured in {browser.featured_video_count} other videos.")
 
-    print(f"You seem to have {browser.total_video_count} videos on Plays.TV\n"
-          f"{browser.author_video_count} of them are uploaded by you, "
-          f"and you're featured in {browser.featured_video_count} other videos.")
+            print(f"\n[{username}] Now we will scroll down until all videos are visible. Please wait...")
+            browser.scroll_down_until_all_videos_are_visible()
 
-    print("\nNow we will scroll down until all videos are visible. Please wait...")
-    browser.scroll_down_until_all_videos_are_visible()
+            videos = browser.get_all_visible_videos()
+    finally:
+        # the browser is no longer needed, so hand it back for the next profile
+        browser.close()
 
-    print(f"Done. Now processing each video...\n")
+    print(f"[{username}] Done. Now processing each video...\n")
+    downloaded_ids = models.ArchivedVideo.scan_downloaded_ids(args.download_path)
     counter = 0
-    for i, video in enumerate(browser.get_all_visible_videos(), 1):
-        print(f"[{i}/{browser.author_video_count}] Attempting to download the highest quality of video: {video.title}")
-        try:
-            video.attempt_to_download_highest_quality(directory=args.download_path, overwrite=args.overwrite)
-        except exceptions.NotArchived as e:
-            print(e)
-        except exceptions.AlreadyDownloaded as e:
-            print(e)
-            counter += 1
-        else:
-            print(f"Done!")
-            counter += 1
-        finally:
-            print()
+    with ThreadPoolExecutor(max_workers=args.jobs) as executor:
+        futures = []
+        for i, video in enumerate(videos, 1):
+            print(f"[{username}] [{i}/{author_video_count}] Queued the highest quality download of video: {video.title}")
+            futures.append(executor.submit(download_video, video, downloaded_ids))
+        print()
+
+        for future in as_completed(futures):
+            if future.result() is True:
+                counter += 1
+
+    print(f"[{username}] We've successfully downloaded {counter} of your {author_video_count} videos. "
+          f"({counter * 100 / author_video_count}%)\n")
+
+
+# first check if the directory exists
+pathlib.Path(args.download_path).mkdir(parents=True, exist_ok=True)
+
+browser_pool = models.BrowserPool(headless=args.headless)
+
+try:
+    print("https://midorina.dev || Feel free to contact me if you have questions or issues <3\n\n"
+          "Launching the browser. Do not close it until we're done.\n"
+          "Internet Archive's website is noticeably slow, so this may take a while...\n")
 
-    print(f"We've successfully downloaded {counter} of your {browser.author_video_count} videos. "
-          f"({counter * 100 / browser.author_video_count}%)\n")
+    # every profile gets a browser of its own from the pool, as a browser can't be shared between threads
+    with ThreadPoolExecutor(max_workers=args.users_at_once) as user_executor:
+        for user_future in [user_executor.submit(scrape_user, username, browser_pool) for username in args.usernames]:
+            user_future.result()
 finally:
-    browser.close()
+    browser_pool.close()
     print("Thanks for using my script. | https://midorina.dev")
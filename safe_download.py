@@ -1,13 +1,84 @@
 import os
 import tempfile as tmp
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict
+from urllib.parse import urlsplit
 
 import requests
+from requests.adapters import HTTPAdapter
 from tqdm import tqdm
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
 
 if not hasattr(os, 'replace'):
     os.replace = os.rename
 
+# how many ranges a single download is split into, and the smallest size worth splitting into a range
+DOWNLOAD_PARTS = 4
+MIN_PART_SIZE = 1024 * 1024
+
+# caps the range requests in flight across every download so the archive doesn't start throttling us
+_range_slots = threading.BoundedSemaphore(8)
+
+# requests per second sent to a single host, the archive starts answering with 429s if we go much faster
+MAX_REQUEST_RATE = 20
+
+# 429 and 503 responses are retried this many times, after the Retry-After header
+# or with an exponential backoff if there is none, before the response is handed to the caller
+RETRY_STATUSES = (429, 503)
+MAX_STATUS_RETRIES = 5
+BACKOFF_FACTOR = 0.3
+
+# one session for every request so connections (and their TLS handshakes) to archive.org are reused.
+# the adapter only retries failed connections. read timeouts reach safe_request as requests.Timeout
+# and statuses are retried there too, so every retry goes through the rate limiter.
+_SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32,
+                       max_retries=Retry(total=3, read=False, backoff_factor=BACKOFF_FACTOR,
+                                         respect_retry_after_header=False))
+_SESSION.mount('https://', _adapter)
+_SESSION.mount('http://', _adapter)
+
+
+class RateLimiter:
+    """Token bucket that lets through `rate` requests per second on average, in bursts of up to `rate`."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self._tokens = rate
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+            # take the token even if it's not there yet, so callers queue up behind each other
+            self._tokens -= 1
+            wait = -self._tokens / self.rate
+
+        if wait > 0:
+            time.sleep(wait)
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def _limiter_for(url: str) -> RateLimiter:
+    host = urlsplit(url).hostname
+    with _limiters_lock:
+        if host not in _limiters:
+            _limiters[host] = RateLimiter(MAX_REQUEST_RATE)
+        return _limiters[host]
+
 
 def get_valid_filename(s: str):
     return ''.join(x if (x.isalnum() or x in '._- ()') else '_' for x in s)
@@ -76,8 +147,13 @@ def open_atomic(filepath, *args, **kwargs):
         os.rename(tmppath, filepath)
 
 
-def safe_download_url(url: str, path: str):
+class _RangesNotSupported(Exception):
+    pass
+
+
+def _download_whole(url: str, path: str):
     r = safe_request(url, stream=True)
+    r.raise_for_status()
     r.raw.decode_content = True
     with open_atomic(path, 'wb') as f, tqdm(desc=path,
                                             total=int(r.headers.get('content-length', 0)),
@@ -88,9 +164,97 @@ def safe_download_url(url: str, path: str):
             bar.update(f.write(data))
 
 
-def safe_request(*args, **kwargs):
-    """This function handles the timeouts by simply retrying."""
-    try:
-        return requests.get(*args, **kwargs, timeout=10)
-    except requests.Timeout:
-        return safe_request(*args, **kwargs)
+def _download_range(url: str, path: str, start: int, end: int, bar: tqdm, bar_lock: threading.Lock):
+    with _range_slots:
+        # ranges and the size from the HEAD request refer to the file itself, so it must not be compressed on the wire
+        with safe_request(url, stream=True, headers={'Range': f'bytes={start}-{end}', 'Accept-Encoding': 'identity'}) as r:
+            if r.status_code != 206:
+                raise _RangesNotSupported(f"Expected a partial response for bytes {start}-{end}, got {r.status_code}: {url}")
+
+            with open(path, 'r+b') as f:
+                f.seek(start)
+                for data in r.iter_content(chunk_size=64 * 1024):
+                    written = f.write(data)
+                    with bar_lock:
+                        bar.update(written)
+
+
+def _download_in_parts(url: str, path: str, size: int):
+    part_size = -(-size // DOWNLOAD_PARTS)
+    ranges = [(start, min(start + part_size, size) - 1) for start in range(0, size, part_size)]
+    bar_lock = threading.Lock()
+
+    with open_atomic(path, 'wb') as f, tqdm(desc=path,
+                                            total=size,
+                                            unit='B',
+                                            unit_scale=True,
+                                            unit_divisor=1024) as bar:
+        # every part writes to its own offset of the pre-sized temporary file
+        f.truncate(size)
+        f.flush()
+
+        with ThreadPoolExecutor(max_workers=DOWNLOAD_PARTS) as executor:
+            futures = [executor.submit(_download_range, url, f.name, start, end, bar, bar_lock)
+                       for start, end in ranges]
+            try:
+                for future in futures:
+                    future.result()
+            except _RangesNotSupported:
+                for future in futures:
+                    future.cancel()
+                raise
+
+
+def safe_download_url(url: str, path: str):
+    """Downloads big files as several concurrent ranges if the server supports it."""
+    head = safe_request(url, method='head', headers={'Accept-Encoding': 'identity'})
+    size = int(head.headers.get('content-length', 0))
+
+    if head.headers.get('accept-ranges') == 'bytes' and size >= DOWNLOAD_PARTS * MIN_PART_SIZE:
+        # use the url we got redirected to, so every part doesn't have to follow the redirects again
+        try:
+            _download_in_parts(head.url, path, size)
+        except _RangesNotSupported:
+            # it advertised ranges but didn't serve them, so fall back to a single stream
+            _download_whole(url, path)
+    else:
+        _download_whole(url, path)
+
+
+def _retry_delay(r: requests.Response, attempt: int) -> float:
+    retry_after = r.headers.get('Retry-After')
+    if retry_after is not None:
+        if retry_after.isdigit():
+            return int(retry_after)
+        try:
+            return max(0.0, (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            pass
+
+    return BACKOFF_FACTOR * 2 ** attempt
+
+
+def safe_request(*args, method: str = 'get', **kwargs):
+    """
+    This function handles the timeouts by simply retrying, and keeps to MAX_REQUEST_RATE for each host.
+
+    Rate limited responses (429 and 503) are retried too, up to MAX_STATUS_RETRIES times.
+    Responses are requested compressed with every encoding urllib3 can decode (brotli too if it's installed).
+    """
+    headers = {'Accept-Encoding': ACCEPT_ENCODING, **kwargs.pop('headers', {})}
+    limiter = _limiter_for(args[0] if args else kwargs['url'])
+
+    attempt = 0
+    while True:
+        limiter.acquire()
+        try:
+            r = _SESSION.request(method, *args, **kwargs, headers=headers, timeout=10)
+        except requests.Timeout:
+            continue
+
+        if r.status_code not in RETRY_STATUSES or attempt >= MAX_STATUS_RETRIES:
+            return r
+
+        r.close()
+        time.sleep(_retry_delay(r, attempt))
+        attempt += 1
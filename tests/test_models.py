@@ -0,0 +1,84 @@
+import os
+
+import pytest
+import requests
+
+import models
+import safe_download
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# what the browser path reads with getAttribute('poster'), after wayback un-rewrites the links
+BROWSER_POSTERS = [
+    'https://d0playscdntv-a.akamaihd.net/video/Ab3dEf9xYz/processed/poster.jpg',
+    'https://d0playscdntv-a.akamaihd.net/video/Qw7eRt2yUi/processed/poster.jpg',
+    'https://d0playscdntv-a.akamaihd.net/video/Op4aSd5fGh/processed/poster.jpg',
+]
+
+
+def read_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        return f.read()
+
+
+def parse_fixture():
+    return models.ArchivedPlaysTVBrowser._parse_archived_page(read_fixture('archived_profile.html'))
+
+
+def browser_serving(monkeypatch, page: str, status_code: int = 200) -> models.ArchivedPlaysTVBrowser:
+    """A profile whose snapshot request answers with the given page, without touching the network."""
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = page.encode('utf-8')
+    response.encoding = 'utf-8'
+    monkeypatch.setattr(safe_download, 'safe_request', lambda *args, **kwargs: response)
+
+    browser = models.ArchivedPlaysTVBrowser(user_name='Midorina')
+    browser.snapshot = models.BaseArchivedWebPage.Snapshot({
+        'status': '200',
+        'available': True,
+        'url': 'http://web.archive.org/web/20191210043532/https://plays.tv/u/Midorina',
+        'timestamp': '20191210043532'
+    })
+    return browser
+
+
+def test_parse_archived_page():
+    count, videos = parse_fixture()
+
+    assert count == 3
+    assert [(video['date'], video['title']) for video in videos] == [
+        ('December 2019', 'Clutch 1v4'),
+        ('December 2019', 'Ace on Mirage'),
+        ('November 2019', 'Pentakill'),
+    ]
+
+
+def test_html_and_browser_paths_build_the_same_mp4_url():
+    _, videos = parse_fixture()
+
+    for video, browser_poster in zip(videos, BROWSER_POSTERS):
+        from_html = models.ArchivedVideo(poster_link=video['poster'])
+        from_browser = models.ArchivedVideo(poster_link=browser_poster)
+
+        assert from_html.mp4_url == from_browser.mp4_url
+        assert from_html.id == from_browser.id
+
+
+def test_without_browser_reads_a_complete_page(monkeypatch):
+    browser = browser_serving(monkeypatch, read_fixture('archived_profile.html'))
+
+    videos = browser.get_all_videos_without_browser()
+
+    assert [video.title for video in videos] == ['Clutch 1v4', 'Ace on Mirage', 'Pentakill']
+
+
+@pytest.mark.parametrize('page, status_code', [
+    (read_fixture('archived_profile_missing_title.html'), 200),
+    ('', 200),
+    (read_fixture('archived_profile.html'), 503),
+])
+def test_without_browser_falls_back_on_unreadable_pages(monkeypatch, page, status_code):
+    browser = browser_serving(monkeypatch, page, status_code)
+
+    assert browser.get_all_videos_without_browser() is None